@@ -38,7 +38,9 @@ from .xml_utils import (
     read_xml_file,
     write_xml_file,
     parse_shapes,
-    calculate_centroid
+    parse_shape_arrays,
+    calculate_centroid,
+    calculate_centroids_bulk
 )
 from .tsp import optimize_tsp
 from .serpentine import generate_serpentine_wells, get_quadrant
@@ -50,7 +52,9 @@ __all__ = [
     'read_xml_file',
     'write_xml_file',
     'parse_shapes',
+    'parse_shape_arrays',
     'calculate_centroid',
+    'calculate_centroids_bulk',
     'optimize_tsp',
     'generate_serpentine_wells',
     'get_quadrant',
@@ -0,0 +1,116 @@
+"""
+Numba-compiled Ramer-Douglas-Peucker kernels
+
+Native versions of the iterative RDP used by reduce_shapes. Importing
+this module raises ImportError when numba is not installed; callers
+fall back to the NumPy implementation in reduce.py.
+"""
+import numpy as np
+from numba import njit, prange
+
+
+@njit(cache=True, error_model='numpy')
+def rdp_numba(pts, eps, out_mask):
+    """
+    Mark the vertices of one polyline kept by RDP simplification
+
+    Args:
+        pts: float64 array of shape (N, 2) with point coordinates
+        eps: Distance threshold for simplification
+        out_mask: Boolean array of length N, filled in place
+    """
+    n = pts.shape[0]
+    if n == 0:
+        return
+    for k in range(n):
+        out_mask[k] = False
+    out_mask[0] = True
+    out_mask[n - 1] = True
+
+    # Flat stack of (start, end) index pairs
+    stack = np.empty(2 * n, dtype=np.int32)
+    stack[0] = 0
+    stack[1] = n - 1
+    top = 2
+
+    if n > 2 and pts[0, 0] == pts[n - 1, 0] and pts[0, 1] == pts[n - 1, 1]:
+        # Closed polygon: split at the vertex farthest from the start
+        pivot = 0
+        max_d2 = -1.0
+        for k in range(n):
+            dx = pts[k, 0] - pts[0, 0]
+            dy = pts[k, 1] - pts[0, 1]
+            d2 = dx * dx + dy * dy
+            if d2 > max_d2:
+                pivot = k
+                max_d2 = d2
+        out_mask[pivot] = True
+        stack[1] = pivot
+        stack[2] = pivot
+        stack[3] = n - 1
+        top = 4
+
+    # Cumulative path length along the polyline
+    arc = np.empty(n, dtype=np.float64)
+    arc[0] = 0.0
+    for k in range(1, n):
+        arc[k] = arc[k - 1] + np.hypot(pts[k, 0] - pts[k - 1, 0], pts[k, 1] - pts[k - 1, 1])
+    arc_limit = (2.0 * eps) ** 2
+
+    while top > 0:
+        top -= 2
+        i = stack[top]
+        j = stack[top + 1]
+        if j - i < 2:
+            continue
+
+        x0 = pts[i, 0]
+        y0 = pts[i, 1]
+        dx = pts[j, 0] - x0
+        dy = pts[j, 1] - y0
+
+        # Path-length bound on the farthest interior point, see _rdp_mask
+        path = arc[j] - arc[i]
+        if path * path - (dx * dx + dy * dy) <= arc_limit:
+            continue
+
+        norm = np.hypot(dx, dy)
+
+        max_idx = i + 1
+        max_value = -1.0
+        for k in range(i + 1, j):
+            d = abs(dx * (pts[k, 1] - y0) - dy * (pts[k, 0] - x0)) / norm
+            if d != d:
+                # NaN from a zero-length segment, same as np.argmax
+                max_idx = k
+                max_value = d
+                break
+            if d > max_value:
+                max_idx = k
+                max_value = d
+
+        if max_value > eps:
+            out_mask[max_idx] = True
+            stack[top] = i
+            stack[top + 1] = max_idx
+            stack[top + 2] = max_idx
+            stack[top + 3] = j
+            top += 4
+
+
+@njit(cache=True, parallel=True)
+def reduce_shapes_numba(points, offsets, eps, out_mask):
+    """
+    Run RDP on every shape of a packed point buffer in parallel
+
+    Args:
+        points: float64 array of shape (total_points, 2) with all shapes
+        offsets: int32 array of length num_shapes + 1; shape i occupies
+            points[offsets[i]:offsets[i+1]]
+        eps: Distance threshold for simplification
+        out_mask: Boolean array of length total_points, filled in place
+    """
+    for i in prange(offsets.shape[0] - 1):
+        start = offsets[i]
+        end = offsets[i + 1]
+        rdp_numba(points[start:end], eps, out_mask[start:end])
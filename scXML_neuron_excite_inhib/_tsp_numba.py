@@ -0,0 +1,143 @@
+"""
+Numba-compiled TSP kernels
+
+Native versions of the greedy construction and 2-opt improvement used
+by optimize_tsp. Importing this module raises ImportError when numba is
+not installed; callers fall back to the NumPy implementation in tsp.py.
+"""
+import numpy as np
+from numba import njit, prange
+
+
+@njit(cache=True)
+def _greedy_nb(D, start):
+    """
+    Greedy nearest neighbor tour over a distance matrix
+
+    Same visit order as the NumPy path in greedy_tsp: ties go to the
+    lowest index, as with np.argmin.
+
+    Args:
+        D: (N, N) float distance matrix
+        start: Index of the starting point
+
+    Returns:
+        int64 array of point indices in visit order
+    """
+    n = D.shape[0]
+    visited = np.zeros(n, dtype=np.bool_)
+    tour = np.empty(n, dtype=np.int64)
+    current = start
+    visited[current] = True
+    tour[0] = current
+
+    for step in range(1, n):
+        row = D[current]
+        best = -1
+        best_d = np.inf
+        for k in range(n):
+            if not visited[k] and row[k] < best_d:
+                best = k
+                best_d = row[k]
+        current = best
+        visited[current] = True
+        tour[step] = current
+
+    return tour
+
+
+@njit(cache=True)
+def _two_opt_nb(tour, D, max_iter):
+    """
+    Improve a tour in place with first-improvement 2-opt
+
+    Compiled twin of two_opt_improve: same move order, same comparison
+    evaluated in the matrix dtype, so both return the same tour. The
+    first point of the tour is never moved. Edge lengths are read from
+    the precomputed distance matrix, so each candidate swap costs four
+    lookups and no sqrt; the length of the fixed edge (a, b) is loaded
+    once per outer step. fastmath is left off, since reassociating the
+    sums would let results drift from the Python version.
+
+    Args:
+        tour: int64 array of point indices in visit order
+        D: (N, N) float distance matrix
+        max_iter: Maximum number of sweeps over the tour
+
+    Returns:
+        The improved tour (same array)
+    """
+    n = tour.shape[0]
+    improved = True
+    iteration = 0
+
+    while improved and iteration < max_iter:
+        improved = False
+        for i in range(1, n - 1):
+            a = tour[i - 1]
+            b = tour[i]
+            d_ab = D[a, b]
+            for j in range(i + 1, n):
+                c = tour[j]
+                d = tour[j + 1] if j + 1 < n else tour[0]
+                if D[a, c] + D[b, d] < d_ab + D[c, d]:
+                    # Reverse tour[i:j+1] with a two-pointer swap
+                    lo = i
+                    hi = j
+                    while lo < hi:
+                        tmp = tour[lo]
+                        tour[lo] = tour[hi]
+                        tour[hi] = tmp
+                        lo += 1
+                        hi -= 1
+                    b = tour[i]
+                    d_ab = D[a, b]
+                    improved = True
+        iteration += 1
+
+    return tour
+
+
+@njit(cache=True, parallel=True)
+def _best_swap_nb(tour, D):
+    """
+    Find the best 2-opt swap of a tour, scanning in parallel
+
+    Each outer position i is scored independently, so the i loop runs
+    across threads; nothing is written to the tour. Ties go to the
+    lowest (i, j), whatever the thread schedule. Deltas are summed in
+    float64 so that float32 rounding cannot fake an improvement, and
+    (1, n - 1) is skipped: its two edges share tour[0], so reversing
+    tour[1:] leaves the cycle unchanged.
+
+    Args:
+        tour: int64 array of point indices in visit order
+        D: (N, N) float distance matrix
+
+    Returns:
+        Tuple (i, j, delta): reversing tour[i:j+1] changes the tour
+        length by delta; delta is 0.0 if no swap improves
+    """
+    n = tour.shape[0]
+    best_delta = np.zeros(n)
+    best_j = np.zeros(n, dtype=np.int64)
+
+    for i in prange(1, n - 1):
+        a = tour[i - 1]
+        b = tour[i]
+        d_ab = np.float64(D[a, b])
+        row_delta = 0.0
+        row_j = 0
+        last = n - 1 if i == 1 else n
+        for j in range(i + 1, last):
+            c = tour[j]
+            d = tour[j + 1] if j + 1 < n else tour[0]
+            delta = (np.float64(D[a, c]) + np.float64(D[b, d])) - d_ab - np.float64(D[c, d])
+            if delta < row_delta:
+                row_delta = delta
+                row_j = j
+        best_delta[i] = row_delta
+        best_j[i] = row_j
+
+    i = np.argmin(best_delta)
+    return i, best_j[i], best_delta[i]
@@ -5,16 +5,18 @@ Combines TSP optimization, serpentine pattern generation, and blank
 distribution to assign cells to 384-well plates efficiently.
 """
 from typing import List, Tuple, Dict
+import os
 import random
 import numpy as np
 import csv
+from scipy.spatial.distance import cdist
 
 from .xml_utils import (
-    read_xml_file, write_xml_file, parse_shapes,
-    replace_shapes, calculate_centroid
+    read_xml_file, write_xml_file, parse_shape_arrays,
+    replace_shapes, calculate_centroids_bulk
 )
 from .tsp import optimize_tsp, find_closest_point
-from .serpentine import generate_serpentine_wells, get_quadrant, calculate_dynamic_blanks
+from .serpentine import generate_serpentine_wells, calculate_dynamic_blanks, _QUADRANTS
 
 
 def assign_wells(inhib_file: str, excite_file: str,
@@ -45,21 +47,23 @@ def assign_wells(inhib_file: str, excite_file: str,
     Returns:
         Dictionary with assignment statistics
     """
+    inhib_name, excite_name = os.path.basename(inhib_file), os.path.basename(excite_file)
+
     if verbose:
         print("=== Serpentine Well Assignment ===\n")
 
     # Read files
     if verbose:
-        print(f"Reading {inhib_file.split('/')[-1]}...")
+        print(f"Reading {inhib_name}...")
     inhib_lines = read_xml_file(inhib_file)
-    inhib_shapes, _ = parse_shapes(inhib_lines, return_cap=True)
+    inhib_shapes, _ = parse_shape_arrays(inhib_lines, return_cap=True)
     if verbose:
         print(f"Found {len(inhib_shapes)} shapes in inhib file")
 
     if verbose:
-        print(f"Reading {excite_file.split('/')[-1]}...")
+        print(f"Reading {excite_name}...")
     excite_lines = read_xml_file(excite_file)
-    excite_shapes, _ = parse_shapes(excite_lines, return_cap=True)
+    excite_shapes, _ = parse_shape_arrays(excite_lines, return_cap=True)
     if verbose:
         print(f"Found {len(excite_shapes)} shapes in excite file")
 
@@ -67,13 +71,12 @@ def assign_wells(inhib_file: str, excite_file: str,
     if verbose:
         print("\nOptimizing inhib0 spatial ordering...")
 
-    inhib_centroids = []
-    for idx in range(len(inhib_shapes)):
-        x, y = inhib_shapes[idx]
-        centroid_x, centroid_y = calculate_centroid(x, y)
-        inhib_centroids.append((centroid_x, centroid_y))
+    inhib_centroids = calculate_centroids_bulk(inhib_shapes)
 
-    inhib_tour, inhib_dist = optimize_tsp(inhib_centroids, verbose=verbose)
+    inhib_dist_matrix = cdist(inhib_centroids, inhib_centroids).astype(np.float32)
+    inhib_tour, inhib_dist = optimize_tsp(
+        inhib_centroids, verbose=verbose, dist_matrix=inhib_dist_matrix
+    )
 
     # Get last inhib cell position
     last_inhib_idx = inhib_tour[-1]
@@ -86,11 +89,7 @@ def assign_wells(inhib_file: str, excite_file: str,
     if verbose:
         print("\nOptimizing excite0 spatial ordering...")
 
-    excite_centroids = []
-    for idx in range(len(excite_shapes)):
-        x, y = excite_shapes[idx]
-        centroid_x, centroid_y = calculate_centroid(x, y)
-        excite_centroids.append((centroid_x, centroid_y))
+    excite_centroids = calculate_centroids_bulk(excite_shapes)
 
     # Find closest excite cell to last inhib
     closest_excite_idx, closest_distance = find_closest_point(
@@ -101,40 +100,20 @@ def assign_wells(inhib_file: str, excite_file: str,
               f"index {closest_excite_idx}, distance = {closest_distance:.2f}")
 
     # Optimize excite tour starting from closest
+    excite_dist_matrix = cdist(excite_centroids, excite_centroids).astype(np.float32)
     excite_tour, excite_dist = optimize_tsp(
-        excite_centroids, start_index=closest_excite_idx, verbose=verbose
+        excite_centroids, start_index=closest_excite_idx, verbose=verbose,
+        dist_matrix=excite_dist_matrix
     )
 
     # Combine shapes in optimized order
     if verbose:
         print("\nCombining shapes in optimized order...")
 
-    combined_shapes = []
-    combined_metadata = []
-
-    for tour_idx in inhib_tour:
-        x, y = inhib_shapes[tour_idx]
-        centroid_x, centroid_y = calculate_centroid(x, y)
-        points = np.array([x, y]).T
-        combined_shapes.append(points)
-        combined_metadata.append({
-            'source': 'inhib0',
-            'original_idx': tour_idx,
-            'centroid_x': centroid_x,
-            'centroid_y': centroid_y
-        })
-
-    for tour_idx in excite_tour:
-        x, y = excite_shapes[tour_idx]
-        centroid_x, centroid_y = calculate_centroid(x, y)
-        points = np.array([x, y]).T
-        combined_shapes.append(points)
-        combined_metadata.append({
-            'source': 'excite0',
-            'original_idx': tour_idx,
-            'centroid_x': centroid_x,
-            'centroid_y': centroid_y
-        })
+    combined_shapes = [inhib_shapes[i] for i in inhib_tour] + [excite_shapes[i] for i in excite_tour]
+    combined_centroids = np.concatenate([inhib_centroids[inhib_tour], excite_centroids[excite_tour]])
+    combined_sources = ['inhib0'] * len(inhib_tour) + ['excite0'] * len(excite_tour)
+    combined_orig = list(inhib_tour) + list(excite_tour)
 
     total_samples = len(combined_shapes)
     if verbose:
@@ -158,55 +137,41 @@ def assign_wells(inhib_file: str, excite_file: str,
     random.seed(random_seed)
     np.random.seed(random_seed)
 
+    blank_mask = np.zeros(len(wells), dtype=bool)
     if num_blanks > 0:
-        blank_positions = sorted(random.sample(range(len(wells)), num_blanks))
-        blank_wells = [wells[i] for i in blank_positions]
+        blank_mask[random.sample(range(len(wells)), num_blanks)] = True
+        blank_wells = [wells[i] for i in np.flatnonzero(blank_mask)]
         if verbose:
             print(f"\nRandomly selected {num_blanks} blank positions (seed={random_seed})")
             print(f"Blank wells: {blank_wells}")
-    else:
-        blank_positions = []
-        if verbose:
-            print(f"\nNo blanks needed")
-
-    # Create well assignments
-    sample_idx = 0
-    well_mapping = []
-    shapes_for_xml = []
-    well_labels_for_xml = []
-
-    for position_idx in range(len(wells)):
-        well = wells[position_idx]
-        quadrant = get_quadrant(well)
-
-        if position_idx in blank_positions:
-            # Blank well
-            well_mapping.append({
-                'well_position': well,
-                'serpentine_order': position_idx,
-                'sample_index': 'BLANK',
-                'source_file': 'BLANK',
-                'original_shape_index': 'BLANK',
-                'centroid_x': '',
-                'centroid_y': '',
-                'quadrant': quadrant
-            })
-        else:
-            # Sample well
-            if sample_idx < len(combined_shapes):
-                well_mapping.append({
-                    'well_position': well,
-                    'serpentine_order': position_idx,
-                    'sample_index': sample_idx,
-                    'source_file': combined_metadata[sample_idx]['source'],
-                    'original_shape_index': combined_metadata[sample_idx]['original_idx'],
-                    'centroid_x': f"{combined_metadata[sample_idx]['centroid_x']:.2f}",
-                    'centroid_y': f"{combined_metadata[sample_idx]['centroid_y']:.2f}",
-                    'quadrant': quadrant
-                })
-                shapes_for_xml.append(combined_shapes[sample_idx])
-                well_labels_for_xml.append(well)
-                sample_idx += 1
+    elif verbose:
+        print(f"\nNo blanks needed")
+
+    # Create well assignments column-wise: blanks take their sampled
+    # positions and samples fill the remaining wells in serpentine order
+    sample_positions = np.flatnonzero(~blank_mask)[:total_samples]
+    row_mask = blank_mask.copy()
+    row_mask[sample_positions] = True
+    positions = np.flatnonzero(row_mask)
+
+    is_blank = blank_mask[positions]
+    sample_idx = np.where(is_blank, 0, np.cumsum(~blank_mask)[positions] - 1)
+    centroid_strs = np.char.mod('%.2f', combined_centroids[sample_idx])
+
+    columns = [
+        np.array(wells)[positions],
+        positions,
+        np.where(is_blank, 'BLANK', sample_idx.astype(str)),
+        np.where(is_blank, 'BLANK', np.array(combined_sources)[sample_idx]),
+        np.where(is_blank, 'BLANK', np.array(combined_orig)[sample_idx].astype(str)),
+        np.where(is_blank, '', centroid_strs[:, 0]),
+        np.where(is_blank, '', centroid_strs[:, 1]),
+        np.array(_QUADRANTS)[positions],
+    ]
+    csv_rows = list(zip(*(column.tolist() for column in columns)))
+
+    shapes_for_xml = combined_shapes[:len(sample_positions)]
+    well_labels_for_xml = [wells[i] for i in sample_positions]
 
     # Write CSV
     if verbose:
@@ -217,14 +182,12 @@ def assign_wells(inhib_file: str, excite_file: str,
 
         fieldnames = ['Well_Position', 'Serpentine_Order', 'Sample_Index', 'Source_File',
                       'Original_Shape_Index', 'Centroid_X', 'Centroid_Y', 'Quadrant']
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        writer.writeheader()
-
-        for entry in well_mapping:
-            writer.writerow(entry)
+        writer = csv.writer(csvfile)
+        writer.writerow(fieldnames)
+        writer.writerows(csv_rows)
 
     if verbose:
-        print(f"CSV created with {len(well_mapping)} entries")
+        print(f"CSV created with {len(csv_rows)} entries")
 
     # Write XML
     if verbose:
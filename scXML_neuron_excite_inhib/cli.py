@@ -2,11 +2,12 @@
 Command-line interface for single-cell sorting pipeline
 """
 import argparse
+import concurrent.futures
 import os
 import sys
 from typing import List
 
-from .reduce import reduce_xml_file
+from .reduce import reduce_xml_file, report_reduction
 from .assign import assign_wells
 
 
@@ -97,8 +98,15 @@ def cmd_pipeline(args):
         excite_reduced = f"{excite_base}_reduced{excite_ext}"
 
     try:
-        reduce_xml_file(args.inhib_file, inhib_reduced, epsilon=args.epsilon, verbose=True)
-        reduce_xml_file(args.excite_file, excite_reduced, epsilon=args.epsilon, verbose=True)
+        # Both files are independent, so reduce them in separate processes
+        with concurrent.futures.ProcessPoolExecutor(max_workers=2) as ex:
+            f1 = ex.submit(reduce_xml_file, args.inhib_file, inhib_reduced, args.epsilon, False)
+            f2 = ex.submit(reduce_xml_file, args.excite_file, excite_reduced, args.epsilon, False)
+            s1, s2 = f1.result(), f2.result()
+
+        # Workers run quietly; print their summaries here, in input order
+        report_reduction(args.inhib_file, inhib_reduced, s1)
+        report_reduction(args.excite_file, excite_reduced, s2)
     except Exception as e:
         print(f"Error during reduction: {e}", file=sys.stderr)
         if args.debug:
@@ -5,8 +5,16 @@ Generates efficient serpentine collection patterns for 384-well plates,
 avoiding outer edge wells and following a snake-like path through quadrants.
 """
 from typing import List, Tuple
+import functools
+import numpy as np
 
 
+# B=1, D=3, F=5 etc. are odd indices but "even" rows, so the table is
+# indexed by (row index is even) << 1 | (column is odd)
+_QUADRANT_LABELS = ("B2", "B3", "C2", "C3")
+
+
+@functools.lru_cache(maxsize=512)
 def get_quadrant(well: str) -> str:
     """
     Determine which quadrant a well belongs to
@@ -23,89 +31,100 @@ def get_quadrant(well: str) -> str:
     Returns:
         Quadrant label: "B2", "B3", "C2", or "C3"
     """
-    row_letter = well[0]
-    col_number = int(well[1:])
-
     # Map letters to indices (A=0, B=1, C=2, etc.)
-    abc = 'ABCDEFGHIJKLMNOPQRST'
-    row_idx = abc.index(row_letter)
-
-    # Determine if row/column are even/odd
-    row_is_even = (row_idx % 2 == 1)  # B=1, D=3, F=5 etc. are odd indices but "even" rows
-    col_is_even = (col_number % 2 == 0)
-
-    if row_is_even and col_is_even:
-        return "B2"
-    elif row_is_even and not col_is_even:
-        return "B3"
-    elif not row_is_even and col_is_even:
-        return "C2"
-    else:
-        return "C3"
-
-
-def generate_serpentine_wells() -> List[str]:
-    """
-    Generate serpentine well pattern for 384-well plate
-
-    Working area: B2 to O23 (avoids outer edges A, P-T, columns 1 & 24)
+    row_idx = ord(well[0]) - 65
+    col_number = int(well[1:])
 
-    Pattern follows 4 phases:
-    1. Even columns (2,4,6...22), rows B→N (serpentine)
-    2. Odd columns (23,21,19...3), row N only (register switch)
-    3. Odd columns (3,5,7...23), rows L→B (serpentine back)
-    4. Even columns (2,4,6...22), rows C→O (serpentine)
+    return _QUADRANT_LABELS[(((row_idx & 1) ^ 1) << 1) | (col_number & 1)]
 
-    Total: 231 wells across 3 complete quadrants
 
-    Returns:
-        List of well position strings in collection order
-    """
+def _build_positions() -> Tuple[List[int], List[int]]:
+    """Build serpentine row indices and column numbers (see generate_serpentine_wells)"""
     abc = 'ABCDEFGHIJKLMNOPQRST'
-    wells = []
+    rows, cols = [], []
 
     # Phase 1: Even columns (2,4...22), rows B,D,F,H,J,L,N (serpentine)
     phase1_rows = ['B', 'D', 'F', 'H', 'J', 'L', 'N']
     phase1_cols = list(range(2, 23, 2))
 
     for row_idx, row in enumerate(phase1_rows):
+        r = abc.index(row)
         if row_idx % 2 == 0:  # Left to right
             for col in phase1_cols:
-                wells.append(f"{row}{col}")
+                rows.append(r)
+                cols.append(col)
         else:  # Right to left (serpentine)
             for col in reversed(phase1_cols):
-                wells.append(f"{row}{col}")
+                rows.append(r)
+                cols.append(col)
 
     # Phase 2: Register switch - Row N, odd columns (23,21...3)
     phase2_cols = list(range(23, 2, -2))
     for col in phase2_cols:
-        wells.append(f"N{col}")
+        rows.append(abc.index('N'))
+        cols.append(col)
 
     # Phase 3: Odd columns (3,5...23), rows L,J,H,F,D,B (serpentine back up)
     phase3_rows = ['L', 'J', 'H', 'F', 'D', 'B']
     phase3_cols = list(range(3, 24, 2))
 
     for row_idx, row in enumerate(phase3_rows):
+        r = abc.index(row)
         if row_idx % 2 == 0:  # Left to right
             for col in phase3_cols:
-                wells.append(f"{row}{col}")
+                rows.append(r)
+                cols.append(col)
         else:  # Right to left (serpentine)
             for col in reversed(phase3_cols):
-                wells.append(f"{row}{col}")
+                rows.append(r)
+                cols.append(col)
 
     # Phase 4: Register switch - Even columns (2,4...22), rows C,E,G,I,K,M,O (serpentine)
     phase4_rows = ['C', 'E', 'G', 'I', 'K', 'M', 'O']
     phase4_cols = list(range(2, 23, 2))
 
     for row_idx, row in enumerate(phase4_rows):
+        r = abc.index(row)
         if row_idx % 2 == 0:  # Left to right
             for col in phase4_cols:
-                wells.append(f"{row}{col}")
+                rows.append(r)
+                cols.append(col)
         else:  # Right to left (serpentine)
             for col in reversed(phase4_cols):
-                wells.append(f"{row}{col}")
+                rows.append(r)
+                cols.append(col)
+
+    return rows, cols
+
+
+# The pattern is fixed, so build it once as parallel row/column arrays;
+# well strings are only needed for CSV and XML labels
+_ROW_IDX, _COL = (np.array(v, dtype=np.int8) for v in _build_positions())
+_WELLS = tuple(f"{'ABCDEFGHIJKLMNOPQRST'[r]}{c}"
+               for r, c in zip(_ROW_IDX.tolist(), _COL.tolist()))
+_QUADRANTS = tuple(np.array(_QUADRANT_LABELS)[
+    (((_ROW_IDX & 1) ^ 1) << 1) | (_COL & 1)
+].tolist())
+
+
+def generate_serpentine_wells() -> Tuple[str, ...]:
+    """
+    Generate serpentine well pattern for 384-well plate
+
+    Working area: B2 to O23 (avoids outer edges A, P-T, columns 1 & 24)
 
-    return wells
+    Pattern follows 4 phases:
+    1. Even columns (2,4,6...22), rows B→N (serpentine)
+    2. Odd columns (23,21,19...3), row N only (register switch)
+    3. Odd columns (3,5,7...23), rows L→B (serpentine back)
+    4. Even columns (2,4,6...22), rows C→O (serpentine)
+
+    Total: 231 wells across 3 complete quadrants
+
+    Returns:
+        Tuple of well position strings in collection order
+    """
+    return _WELLS
 
 
 def calculate_dynamic_blanks(num_samples: int, quadrant_size: int = 77) -> int:
@@ -1,46 +1,107 @@
 """
 XML utilities for parsing and writing BIAS XML files
 """
+import re
+
 import numpy as np
 
 
-def parse_shapes(file_lines, return_cap=False):
+def _to_points(x, y, idx):
+    """Stack x and y coordinate lists of shape idx into an (N, 2) int32 array"""
+    if len(x) != len(y):
+        raise ValueError(
+            f"Shape index {idx} has {len(x)} X coordinates but {len(y)} Y coordinates"
+        )
+    points = np.empty((len(x), 2), dtype=np.int32)
+    points[:, 0] = x
+    points[:, 1] = y
+    return points
+
+
+# One match per relevant line of the shape section: a <Shape_...>,
+# <X...> or <Y...> tag with the text after it, or any line mentioning
+# CapID with the text after its first '>'. An <X...> line directly
+# followed by a <Y...> line, the usual layout, is taken as one match.
+_SHAPE_LINE = re.compile(
+    r'^<X[^>\n]*>([^<\n]*)[^\n]*\n<Y[^>\n]*>([^<\n]*)'
+    r'|^<(Shape_|X|Y)[^>\n]*>([^<\n]*)'
+    r'|^(?=[^\n]*CapID)[^>\n]*>([^<\n]*)',
+    re.MULTILINE,
+)
+
+
+def parse_shape_arrays(file_lines, return_cap=False):
     """
-    Parse shapes from XML file lines
+    Parse shapes from XML file lines into coordinate arrays
+
+    Everything from the ShapeCount line on is scanned with a single
+    regular expression pass rather than line by line.
 
     Args:
         file_lines: List of XML file lines (strings)
         return_cap: If True, also return CapID annotations
 
     Returns:
-        shapes: Dict mapping shape index to (x_coords, y_coords)
+        shapes: List of int32 numpy arrays (N x 2), one per shape
         caps: Dict mapping shape index to CapID (if return_cap=True)
     """
-    shapes = {}
+    shapes = []
     caps = {}
     x, y = [], []
-    idx = 0
-    reading = False
 
-    for line in file_lines:
+    for start, line in enumerate(file_lines):
         if line.startswith('<ShapeCount'):
-            reading = True
-        if reading:
-            if line.startswith('<Shape_'):
-                if len(x) != 0:
-                    shapes[idx] = (x, y)
-                    idx += 1
-                    x, y = [], []
-            if line.startswith('<X'):
-                x.append(int(line.split('>')[1].split('<')[0]))
-            if line.startswith('<Y'):
-                y.append(int(line.split('>')[1].split('<')[0]))
-            if 'CapID' in line:
-                caps[idx] = line.split('>')[1].split('<')[0]
+            body = '\n'.join(file_lines[start:])
+            break
+    else:
+        body = ''
+
+    # Dispatch on which alternative matched, not on the captured text,
+    # which may legitimately be empty
+    for m in _SHAPE_LINE.finditer(body):
+        group = m.lastindex
+        if group == 2:
+            x.append(int(m.group(1)))
+            y.append(int(m.group(2)))
+        elif m.group(3) == 'X':
+            x.append(int(m.group(4)))
+        elif m.group(3) == 'Y':
+            y.append(int(m.group(4)))
+        elif group == 4:
+            # New <Shape_...>: close the current one if it has points
+            if len(x) != 0:
+                shapes.append(_to_points(x, y, len(shapes)))
+                x, y = [], []
+        else:
+            caps[len(shapes)] = m.group(5)
 
     if len(x) != 0:
-        shapes[idx] = (x, y)
-        idx += 1
+        shapes.append(_to_points(x, y, len(shapes)))
+
+    if return_cap:
+        return shapes, caps
+    else:
+        return shapes
+
+
+def parse_shapes(file_lines, return_cap=False):
+    """
+    Parse shapes from XML file lines
+
+    Thin wrapper around parse_shape_arrays for callers that expect
+    coordinate lists.
+
+    Args:
+        file_lines: List of XML file lines (strings)
+        return_cap: If True, also return CapID annotations
+
+    Returns:
+        shapes: Dict mapping shape index to (x_coords, y_coords)
+        caps: Dict mapping shape index to CapID (if return_cap=True)
+    """
+    arrays, caps = parse_shape_arrays(file_lines, return_cap=True)
+    shapes = {idx: (points[:, 0].tolist(), points[:, 1].tolist())
+              for idx, points in enumerate(arrays)}
 
     if return_cap:
         return shapes, caps
@@ -83,9 +144,12 @@ def replace_shapes(file_lines, shapes, new_annotations=None, update_count=False)
                     cap = new_annotations[idx]
                     converted.append(f'<CapID>{cap}</CapID>')
 
-                for i in range(len(shape)):
-                    converted.append(f'<X_{i+1}>{shape[i,0]}</X_{i+1}>')
-                    converted.append(f'<Y_{i+1}>{shape[i,1]}</Y_{i+1}>')
+                # One X/Y line pair per point, formatted from plain
+                # Python numbers rather than per-element array indexing
+                converted.extend(
+                    f'<X_{i}>{px}</X_{i}>\n<Y_{i}>{py}</Y_{i}>'
+                    for i, (px, py) in enumerate(np.asarray(shape).tolist(), 1)
+                )
 
                 converted.append(f'</Shape_{idx+1}>')
             break
@@ -116,9 +180,49 @@ def write_xml_file(filepath, content):
 
 def calculate_centroid(x, y):
     """Calculate centroid of a shape"""
-    return np.mean(x), np.mean(y)
+    if isinstance(x, np.ndarray) or isinstance(y, np.ndarray):
+        return np.mean(x), np.mean(y)
+    # Plain sequences: Python sums avoid the ufunc dispatch of np.mean
+    return sum(x) / len(x), sum(y) / len(y)
+
+
+def calculate_centroids_bulk(shapes):
+    """
+    Calculate the centroids of many shapes at once
+
+    Args:
+        shapes: List of (N x 2) coordinate arrays as returned by
+            parse_shape_arrays, or a dict mapping shape index to
+            (x_coords, y_coords) as returned by parse_shapes
+
+    Returns:
+        float64 array of shape (num_shapes, 2) with one (x, y) centroid
+        per shape
+    """
+    if isinstance(shapes, dict):
+        shapes = [np.array(shapes[idx]).T for idx in range(len(shapes))]
+    if len(shapes) == 0:
+        return np.empty((0, 2))
+
+    counts = np.array([len(points) for points in shapes])
+    if (counts == 0).any():
+        raise ValueError("Cannot compute the centroid of an empty shape")
+
+    # One segmented sum over all points instead of a mean per shape
+    packed = np.concatenate(shapes, dtype=np.float64)
+    starts = np.concatenate(([0], np.cumsum(counts[:-1])))
+    return np.add.reduceat(packed, starts, axis=0) / counts[:, None]
 
 
 def calculate_poly_area(x, y):
     """Calculate area of polygon using Shoelace formula"""
-    return 0.5 * np.abs(np.dot(x, np.roll(y, 1)) - np.dot(y, np.roll(x, 1)))
+    # Promote to float64 so int32 coordinate products cannot overflow
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    if x.size == 0:
+        return 0.0
+    # Shoelace over slices; the closing edge (last -> first) is added
+    # separately so no rolled copies are needed
+    twice_area = (np.dot(x[:-1], y[1:]) - np.dot(x[1:], y[:-1])
+                  + x[-1] * y[0] - x[0] * y[-1])
+    return float(0.5 * abs(twice_area))
@@ -43,6 +43,9 @@ setup(
     ],
     python_requires='>=3.8',
     install_requires=read_requirements(),
+    extras_require={
+        'fast': ['numba>=0.55'],
+    },
     entry_points={
         'console_scripts': [
             'scXML_neuron_excite_inhib=scXML_neuron_excite_inhib.cli:main',
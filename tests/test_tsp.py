@@ -0,0 +1,67 @@
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from scXML_neuron_excite_inhib import tsp
+
+
+def _grid(nx, ny, step=300.0):
+    return np.array([(x * step, y * step) for x in range(nx) for y in range(ny)])
+
+
+class TwoOptBestTest(unittest.TestCase):
+    """two_opt_best must stop on float32 ties instead of cycling"""
+
+    def _run(self, coords, use_numba):
+        D = tsp._pairwise(tsp._as_coords(coords))
+        tour = tsp.greedy_tsp(coords, 0, D)
+        swap = tsp._best_swap_nb if use_numba else tsp._best_swap
+        calls = []
+
+        def counted(t, d):
+            calls.append(1)
+            return swap(t, d)
+
+        name = '_best_swap_nb' if use_numba else '_best_swap'
+        patches = [mock.patch.object(tsp, name, counted)]
+        if not use_numba:
+            patches.append(mock.patch.object(tsp, '_best_swap_nb', None))
+        for p in patches:
+            p.start()
+        try:
+            result = tsp.two_opt_best(tour, D, max_swaps=10 * len(coords))
+        finally:
+            for p in reversed(patches):
+                p.stop()
+
+        self.assertEqual(result[0], 0)
+        self.assertEqual(sorted(result), list(range(len(coords))))
+        return result, len(calls)
+
+    def _check(self, coords):
+        backends = [False] + ([True] if tsp._best_swap_nb is not None else [])
+        results = []
+        for use_numba in backends:
+            result, calls = self._run(coords, use_numba)
+            # The last call finds no improving swap; hitting max_swaps
+            # means the loop was cycling
+            self.assertLess(calls, 10 * len(coords))
+            results.append(result)
+        for result in results[1:]:
+            self.assertEqual(result, results[0])
+
+    def test_tie_heavy_grid_converges(self):
+        self._check(_grid(14, 12))
+
+    def test_random_points_converge(self):
+        rng = np.random.default_rng(0)
+        self._check(rng.uniform(0, 5e4, (42, 2)))
+
+    def test_tiny_tours(self):
+        for n in (2, 3, 4):
+            self._check(_grid(n, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()